@@ -7,6 +7,7 @@ Simple script to run the supermarket analysis with minimal setup
 import sys
 import os
 import subprocess
+import importlib.util
 
 def check_dependencies():
     """Check if required packages are installed"""
@@ -16,15 +17,13 @@ def check_dependencies():
         'matplotlib': 'matplotlib',
         'seaborn': 'seaborn',
         'plotly': 'plotly',
-        'sklearn': 'scikit-learn'
+        'numba': 'numba'
     }
-    missing_packages = []
-    
-    for import_name, package_name in required_packages.items():
-        try:
-            __import__(import_name)
-        except ImportError:
-            missing_packages.append(package_name)
+    # find_spec only locates the package; it doesn't execute (import) it
+    missing_packages = [
+        package_name for import_name, package_name in required_packages.items()
+        if importlib.util.find_spec(import_name) is None
+    ]
     
     if missing_packages:
         print("❌ Missing required packages:")
@@ -4,20 +4,57 @@ Supermarket Sales Analysis
 A comprehensive data analytics project for supermarket sales data
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
+from numba import njit, prange
 import warnings
 warnings.filterwarnings('ignore')
 
+MONTH_ORDER = ['January', 'February', 'March', 'April', 'May', 'June', 'July',
+               'August', 'September', 'October', 'November', 'December']
+DAY_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+CATEGORICAL_COLUMNS = ['Branch', 'City', 'Product line', 'Customer type', 'Gender', 'Payment']
+USE_COLUMNS = ['Date', 'Branch', 'City', 'Customer type', 'Gender', 'Product line', 'Unit price',
+               'Quantity', 'Sales', 'Payment', 'Rating', 'gross income']
+# Low-cardinality labels as categoricals so groupby works on integer codes, and
+# secondary numeric columns narrowed. Sales and Rating stay float64: float32 drifts
+# revenue totals by cents and moves one-decimal ratings across histogram bin edges.
+COLUMN_DTYPES = {
+    **{col: 'category' for col in CATEGORICAL_COLUMNS},
+    'Unit price': 'float32',
+    'Quantity': 'int16',
+    'Sales': 'float64',
+    'Rating': 'float64',
+    'gross income': 'float32'
+}
+
+@njit(parallel=True, fastmath=True, cache=True)
+def kmeans_3x3(X, mean, std, centers, labels):
+    """Standardize each 3-feature row and assign it to the nearest of 3 centroids, in one pass"""
+    for i in prange(X.shape[0]):
+        x0 = (X[i, 0] - mean[0]) / std[0]
+        x1 = (X[i, 1] - mean[1]) / std[1]
+        x2 = (X[i, 2] - mean[2]) / std[2]
+        # Seed with centroid 0 rather than inf: fastmath assumes no infinities
+        d0 = x0 - centers[0, 0]
+        d1 = x1 - centers[0, 1]
+        d2 = x2 - centers[0, 2]
+        best = 0
+        best_dist = d0 * d0 + d1 * d1 + d2 * d2
+        for k in range(1, 3):
+            d0 = x0 - centers[k, 0]
+            d1 = x1 - centers[k, 1]
+            d2 = x2 - centers[k, 2]
+            dist = d0 * d0 + d1 * d1 + d2 * d2
+            if dist < best_dist:
+                best = k
+                best_dist = dist
+        labels[i] = best
+
 class SupermarketAnalyzer:
     def __init__(self, data_path):
         """Initialize the analyzer with data"""
@@ -25,118 +62,191 @@ class SupermarketAnalyzer:
         self.df = None
         self.load_data()
         
+    def _read_data(self):
+        """Read the typed sales table, using a Parquet cache next to the CSV when it is fresh"""
+        cache_path = os.path.splitext(self.data_path)[0] + '.parquet'
+        if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(self.data_path):
+            try:
+                df = pd.read_parquet(cache_path, columns=USE_COLUMNS, engine='pyarrow', memory_map=True)
+                # A cache written with other dtypes (e.g. float32 Sales) can't be cast back losslessly; rebuild it
+                if all(str(df[col].dtype) == dtype for col, dtype in COLUMN_DTYPES.items()):
+                    return df
+            except Exception as e:
+                print(f"⚠️ Ignoring unreadable Parquet cache: {e}")
+        
+        df = pd.read_csv(self.data_path, usecols=USE_COLUMNS, dtype=COLUMN_DTYPES, parse_dates=['Date'])
+        try:
+            df.to_parquet(cache_path, engine='pyarrow', compression='zstd')
+        except Exception as e:
+            print(f"⚠️ Could not write Parquet cache: {e}")
+        return df
+    
     def load_data(self):
         """Load and preprocess the data"""
         try:
-            self.df = pd.read_csv(self.data_path)
+            self.df = self._read_data()
             print(f"✅ Data loaded successfully: {self.df.shape[0]} rows, {self.df.shape[1]} columns")
             
-            # Convert date column
-            self.df['Date'] = pd.to_datetime(self.df['Date'])
-            self.df['Month'] = self.df['Date'].dt.month_name()
-            self.df['Day'] = self.df['Date'].dt.day_name()
+            # Derive calendar columns
+            self.df['Month'] = pd.Categorical(self.df['Date'].dt.month_name(), categories=MONTH_ORDER, ordered=True)
+            self.df['Day'] = pd.Categorical(self.df['Date'].dt.day_name(), categories=DAY_ORDER, ordered=True)
+            
+            # Cache Sales aggregates so each report section doesn't re-group the frame
+            self._branch_sales_agg = self._grouped_sales('Branch')
+            self._branch_sales_sum = self._branch_sales_agg['sum']
+            self._product_sales_agg = self._grouped_sales('Product line')
+            self._product_sales_sum = self._product_sales_agg['sum']
+            self._month_sales_sum = self._grouped_sales('Month')['sum']
+            self._day_sales_sum = self._grouped_sales('Day')['sum']
+            sales = self.df['Sales'].dropna().to_numpy()
+            sales_sum = sales.sum()
+            self._scalar_stats = {
+                'sales_sum': sales_sum,
+                'sales_mean': sales_sum / len(sales),
+                'rating_mean': self.df['Rating'].dropna().to_numpy().mean()
+            }
+            dates = self.df['Date'].to_numpy()
+            dates = dates[~np.isnat(dates)]  # skip missing dates like Series.min/max do
+            self._date_min, self._date_max = pd.Timestamp(dates.min()), pd.Timestamp(dates.max())
             
             print("📊 Data preprocessing completed")
         except Exception as e:
             print(f"❌ Error loading data: {e}")
     
+    def _grouped_sales(self, col):
+        """Sales count/sum/mean per observed category of a categorical column, via bincount on its codes"""
+        cat = self.df[col].cat
+        codes = cat.codes.to_numpy()
+        sales = self.df['Sales'].to_numpy()
+        # Missing labels carry code -1; skip them and missing Sales like groupby does
+        valid = (codes >= 0) & ~np.isnan(sales)
+        n = len(cat.categories)
+        counts = np.bincount(codes[valid], minlength=n)
+        sums = np.bincount(codes[valid], weights=sales[valid], minlength=n)
+        observed = counts > 0
+        return pd.DataFrame({
+            'count': counts[observed],
+            'sum': sums[observed],
+            'mean': sums[observed] / counts[observed]
+        }, index=pd.CategoricalIndex(cat.categories[observed], dtype=self.df[col].dtype, name=col))
+    
+    def _category_counts(self, col):
+        """Row count per category of a categorical column, in category order, via bincount on its codes"""
+        cat = self.df[col].cat
+        codes = cat.codes.to_numpy()
+        # Missing labels carry code -1; skip them like value_counts drops NaN
+        return pd.Series(np.bincount(codes[codes >= 0], minlength=len(cat.categories)), index=cat.categories)
+    
     def basic_stats(self):
         """Display basic statistics"""
         print("\n" + "="*50)
         print("📈 BASIC STATISTICS")
         print("="*50)
         
-        print(f"Total Sales: ${self.df['Sales'].sum():,.2f}")
-        print(f"Average Sale: ${self.df['Sales'].mean():.2f}")
+        stats = self._scalar_stats
+        print(f"Total Sales: ${stats['sales_sum']:,.2f}")
+        print(f"Average Sale: ${stats['sales_mean']:.2f}")
         print(f"Total Transactions: {len(self.df):,}")
-        print(f"Date Range: {self.df['Date'].min().strftime('%Y-%m-%d')} to {self.df['Date'].max().strftime('%Y-%m-%d')}")
+        print(f"Date Range: {self._date_min.strftime('%Y-%m-%d')} to {self._date_max.strftime('%Y-%m-%d')}")
         
         print("\n🏪 Branch Performance:")
-        branch_stats = self.df.groupby('Branch')['Sales'].agg(['count', 'sum', 'mean']).round(2)
+        branch_stats = self._branch_sales_agg.round(2)
         print(branch_stats)
         
         print("\n🛍️ Product Line Performance:")
-        product_stats = self.df.groupby('Product line')['Sales'].agg(['count', 'sum', 'mean']).round(2)
+        product_stats = self._product_sales_agg.round(2)
         print(product_stats.sort_values('sum', ascending=False))
     
     def create_visualizations(self):
         """Create comprehensive visualizations"""
+        import matplotlib.pyplot as plt
+        import seaborn as sns
+        
         print("\n🎨 Creating visualizations...")
         
         # Set style
         plt.style.use('default')
         sns.set_palette('husl')
-        fig = plt.figure(figsize=(20, 15))
+        fig, axes = plt.subplots(3, 3, figsize=(20, 15))
         
         # 1. Sales by Branch
-        plt.subplot(3, 3, 1)
-        branch_sales = self.df.groupby('Branch')['Sales'].sum()
-        plt.bar(branch_sales.index, branch_sales.values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-        plt.title('Total Sales by Branch', fontsize=14, fontweight='bold')
-        plt.ylabel('Sales ($)')
+        ax = axes[0, 0]
+        branch_sales = self._branch_sales_sum
+        ax.bar(branch_sales.index, branch_sales.values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+        ax.set_title('Total Sales by Branch', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Sales ($)')
         
         # 2. Sales by Product Line
-        plt.subplot(3, 3, 2)
-        product_sales = self.df.groupby('Product line')['Sales'].sum().sort_values(ascending=False)
-        plt.barh(product_sales.index, product_sales.values, color='skyblue')
-        plt.title('Sales by Product Line', fontsize=14, fontweight='bold')
-        plt.xlabel('Sales ($)')
+        ax = axes[0, 1]
+        product_sales = self._product_sales_sum.sort_values(ascending=False)
+        ax.barh(product_sales.index, product_sales.values, color='skyblue')
+        ax.set_title('Sales by Product Line', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Sales ($)')
         
         # 3. Customer Type Distribution
-        plt.subplot(3, 3, 3)
-        customer_counts = self.df['Customer type'].value_counts()
-        plt.pie(customer_counts.values, labels=customer_counts.index, autopct='%1.1f%%', 
-                colors=['#FF9999', '#66B2FF'])
-        plt.title('Customer Type Distribution', fontsize=14, fontweight='bold')
+        ax = axes[0, 2]
+        customer_counts = self._category_counts('Customer type')
+        ax.pie(customer_counts.values, labels=customer_counts.index, autopct='%1.1f%%', 
+               colors=['#FF9999', '#66B2FF'])
+        ax.set_title('Customer Type Distribution', fontsize=14, fontweight='bold')
         
         # 4. Gender Distribution
-        plt.subplot(3, 3, 4)
-        gender_counts = self.df['Gender'].value_counts()
-        plt.pie(gender_counts.values, labels=gender_counts.index, autopct='%1.1f%%',
-                colors=['#FFB366', '#66FFB2'])
-        plt.title('Gender Distribution', fontsize=14, fontweight='bold')
+        ax = axes[1, 0]
+        gender_counts = self._category_counts('Gender')
+        ax.pie(gender_counts.values, labels=gender_counts.index, autopct='%1.1f%%',
+               colors=['#FFB366', '#66FFB2'])
+        ax.set_title('Gender Distribution', fontsize=14, fontweight='bold')
         
         # 5. Payment Method Distribution
-        plt.subplot(3, 3, 5)
-        payment_counts = self.df['Payment'].value_counts()
-        plt.bar(payment_counts.index, payment_counts.values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
-        plt.title('Payment Methods', fontsize=14, fontweight='bold')
-        plt.xticks(rotation=45)
+        ax = axes[1, 1]
+        payment_counts = self._category_counts('Payment')
+        ax.bar(payment_counts.index, payment_counts.values, color=['#FF6B6B', '#4ECDC4', '#45B7D1'])
+        ax.set_title('Payment Methods', fontsize=14, fontweight='bold')
+        ax.tick_params(axis='x', rotation=45)
         
         # 6. Sales Distribution
-        plt.subplot(3, 3, 6)
-        plt.hist(self.df['Sales'], bins=30, color='lightcoral', alpha=0.7, edgecolor='black')
-        plt.title('Sales Distribution', fontsize=14, fontweight='bold')
-        plt.xlabel('Sales ($)')
-        plt.ylabel('Frequency')
+        ax = axes[1, 2]
+        values = self.df['Sales'].to_numpy()
+        counts, edges = np.histogram(values[~np.isnan(values)], bins=30)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               color='lightcoral', alpha=0.7, edgecolor='black')
+        ax.set_title('Sales Distribution', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Sales ($)')
+        ax.set_ylabel('Frequency')
         
         # 7. Rating Distribution
-        plt.subplot(3, 3, 7)
-        plt.hist(self.df['Rating'], bins=20, color='lightgreen', alpha=0.7, edgecolor='black')
-        plt.title('Customer Rating Distribution', fontsize=14, fontweight='bold')
-        plt.xlabel('Rating')
-        plt.ylabel('Frequency')
+        ax = axes[2, 0]
+        values = self.df['Rating'].to_numpy()
+        counts, edges = np.histogram(values[~np.isnan(values)], bins=20)
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               color='lightgreen', alpha=0.7, edgecolor='black')
+        ax.set_title('Customer Rating Distribution', fontsize=14, fontweight='bold')
+        ax.set_xlabel('Rating')
+        ax.set_ylabel('Frequency')
         
         # 8. Sales by Month
-        plt.subplot(3, 3, 8)
-        monthly_sales = self.df.groupby('Month')['Sales'].sum()
-        month_order = ['January', 'February', 'March']
-        monthly_sales = monthly_sales.reindex([m for m in month_order if m in monthly_sales.index])
-        plt.plot(monthly_sales.index, monthly_sales.values, marker='o', linewidth=2, markersize=8)
-        plt.title('Monthly Sales Trend', fontsize=14, fontweight='bold')
-        plt.ylabel('Sales ($)')
-        plt.xticks(rotation=45)
+        ax = axes[2, 1]
+        monthly_sales = self._month_sales_sum  # already in calendar order
+        ax.plot(monthly_sales.index, monthly_sales.values, marker='o', linewidth=2, markersize=8)
+        ax.set_title('Monthly Sales Trend', fontsize=14, fontweight='bold')
+        ax.set_ylabel('Sales ($)')
+        ax.tick_params(axis='x', rotation=45)
         
         # 9. Correlation Heatmap
-        plt.subplot(3, 3, 9)
+        ax = axes[2, 2]
         numeric_cols = ['Unit price', 'Quantity', 'Sales', 'Rating', 'gross income']
-        corr_matrix = self.df[numeric_cols].corr()
-        sns.heatmap(corr_matrix, annot=True, cmap='coolwarm', center=0, square=True)
-        plt.title('Correlation Matrix', fontsize=14, fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('supermarket_analysis_dashboard.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        # Pearson correlation as a single GEMM over standardized float32 columns
+        arr = self.df[numeric_cols].to_numpy(dtype=np.float32)
+        arr -= arr.mean(axis=0)
+        arr /= arr.std(axis=0)
+        corr_matrix = (arr.T @ arr) / arr.shape[0]
+        sns.heatmap(corr_matrix, xticklabels=numeric_cols, yticklabels=numeric_cols,
+                    annot=True, cmap='coolwarm', center=0, square=True, ax=ax)
+        ax.set_title('Correlation Matrix', fontsize=14, fontweight='bold')
+        
+        fig.tight_layout()
+        fig.savefig('supermarket_analysis_dashboard.png', dpi=150, bbox_inches='tight')
+        plt.close(fig)
         
         print("✅ Dashboard saved as 'supermarket_analysis_dashboard.png'")
     
@@ -147,22 +257,39 @@ class SupermarketAnalyzer:
         
         # Customer Segmentation using K-Means
         features = ['Sales', 'Quantity', 'Rating']
-        X = self.df[features].copy()
-        
-        # Standardize features
-        scaler = StandardScaler()
-        X_scaled = scaler.fit_transform(X)
-        
-        # K-Means clustering
-        kmeans = KMeans(n_clusters=3, random_state=42)
-        self.df['Customer_Segment'] = kmeans.fit_predict(X_scaled)
-        
-        # Segment analysis
-        segment_analysis = self.df.groupby('Customer_Segment').agg({
+        X = self.df[features].to_numpy(dtype=np.float32)
+        # Rows with a missing feature can't be placed (and NaN is undefined under fastmath); cluster the rest
+        complete = np.isfinite(X).all(axis=1)
+        X = X[complete]
+        if len(X) < 3:
+            raise ValueError("Customer segmentation needs at least 3 rows with Sales, Quantity and Rating")
+        
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1  # constant feature: leave unscaled, as StandardScaler does
+        
+        # K-Means clustering: Lloyd iterations with standardization fused into the assignment kernel
+        rng = np.random.default_rng(42)
+        centers = (X[rng.choice(len(X), size=3, replace=False)] - mean) / std
+        labels = np.zeros(len(X), dtype=np.int64)
+        previous = np.full(len(X), -1, dtype=np.int64)
+        for _ in range(300):  # same cap as sklearn's max_iter; usually exits early on convergence
+            kmeans_3x3(X, mean, std, centers, labels)
+            if np.array_equal(labels, previous):
+                break
+            previous[:] = labels
+            # New centroids are the per-cluster means of the raw features, moved into scaled space
+            counts = np.bincount(labels, minlength=3)
+            for j in range(3):
+                sums = np.bincount(labels, weights=X[:, j], minlength=3)
+                centers[:, j] = np.where(counts > 0, (sums / np.maximum(counts, 1) - mean[j]) / std[j], centers[:, j])
+        
+        # Segment analysis (labels are attached to a temporary frame, not stored on self.df)
+        segment_analysis = self.df[complete].assign(Customer_Segment=labels).groupby('Customer_Segment', observed=True, sort=False).agg({
             'Sales': ['mean', 'count'],
             'Quantity': 'mean',
             'Rating': 'mean'
-        }).round(2)
+        }).round(2).sort_index()
         
         print("👥 Customer Segmentation Results:")
         print(segment_analysis)
@@ -171,41 +298,45 @@ class SupermarketAnalyzer:
         print("\n💡 Key Business Insights:")
         
         # Top performing branch
-        top_branch = self.df.groupby('Branch')['Sales'].sum().idxmax()
+        top_branch = self._branch_sales_sum.index[np.nanargmax(self._branch_sales_sum.values)]
         print(f"• Best performing branch: {top_branch}")
         
         # Most popular product
-        top_product = self.df.groupby('Product line')['Sales'].sum().idxmax()
+        top_product = self._product_sales_sum.index[np.nanargmax(self._product_sales_sum.values)]
         print(f"• Most profitable product line: {top_product}")
         
         # Peak sales day
-        peak_day = self.df.groupby('Day')['Sales'].sum().idxmax()
+        peak_day = self._day_sales_sum.index[np.nanargmax(self._day_sales_sum.values)]
         print(f"• Peak sales day: {peak_day}")
         
         # Average basket size
-        avg_basket = self.df['Sales'].mean()
+        avg_basket = self._scalar_stats['sales_mean']
         print(f"• Average transaction value: ${avg_basket:.2f}")
         
         # Customer satisfaction
-        avg_rating = self.df['Rating'].mean()
+        avg_rating = self._scalar_stats['rating_mean']
         print(f"• Average customer rating: {avg_rating:.1f}/10")
     
     def create_interactive_plots(self):
         """Create interactive Plotly visualizations"""
+        import plotly.express as px
+        
         print("\n🌟 Creating interactive visualizations...")
         
-        # Interactive sales by city and branch
+        # Interactive sales by city and branch (pre-aggregated, so only the leaf totals are serialized)
+        city_branch_sales = self.df.groupby(['City', 'Branch'], observed=True, sort=False, as_index=False)['Sales'].sum()
         fig1 = px.sunburst(
-            self.df, 
+            city_branch_sales, 
             path=['City', 'Branch'], 
             values='Sales',
             title='Sales Distribution by City and Branch'
         )
         fig1.write_html('sales_sunburst.html')
         
-        # Interactive scatter plot
+        # Interactive scatter plot (HTML size grows with point count, so cap it)
+        scatter_df = self.df.sample(n=5000, random_state=0) if len(self.df) > 5000 else self.df
         fig2 = px.scatter(
-            self.df, 
+            scatter_df, 
             x='Unit price', 
             y='Sales', 
             color='Product line',
@@ -221,36 +352,37 @@ class SupermarketAnalyzer:
         """Generate a comprehensive analysis report"""
         print("\n📋 Generating Analysis Report...")
         
-        report = f"""
+        stats = self._scalar_stats
+        with open('analysis_report.txt', 'w') as f:
+            f.write(f"""
 SUPERMARKET SALES ANALYSIS REPORT
 {'='*50}
 
 EXECUTIVE SUMMARY:
-• Total Revenue: ${self.df['Sales'].sum():,.2f}
+• Total Revenue: ${stats['sales_sum']:,.2f}
 • Total Transactions: {len(self.df):,}
-• Average Transaction: ${self.df['Sales'].mean():.2f}
-• Analysis Period: {self.df['Date'].min().strftime('%B %Y')} - {self.df['Date'].max().strftime('%B %Y')}
+• Average Transaction: ${stats['sales_mean']:.2f}
+• Analysis Period: {self._date_min.strftime('%B %Y')} - {self._date_max.strftime('%B %Y')}
 
 BRANCH PERFORMANCE:
-{self.df.groupby('Branch')['Sales'].agg(['count', 'sum']).to_string()}
-
-PRODUCT LINE ANALYSIS:
-{self.df.groupby('Product line')['Sales'].sum().sort_values(ascending=False).to_string()}
+""")
+            # Tables are rendered straight into the file handle
+            self._branch_sales_agg[['count', 'sum']].to_string(buf=f)
+            f.write("\n\nPRODUCT LINE ANALYSIS:\n")
+            self._product_sales_sum.sort_values(ascending=False).to_string(buf=f)
+            f.write(f"""
 
 CUSTOMER INSIGHTS:
-• Member vs Normal: {self.df['Customer type'].value_counts().to_dict()}
-• Gender Split: {self.df['Gender'].value_counts().to_dict()}
-• Average Rating: {self.df['Rating'].mean():.1f}/10
+• Member vs Normal: {self._category_counts('Customer type').to_dict()}
+• Gender Split: {self._category_counts('Gender').to_dict()}
+• Average Rating: {stats['rating_mean']:.1f}/10
 
 RECOMMENDATIONS:
 1. Focus marketing efforts on the top-performing product lines
 2. Implement loyalty programs to convert normal customers to members
 3. Optimize inventory based on branch-specific performance
 4. Leverage peak sales days for promotional activities
-        """
-        
-        with open('analysis_report.txt', 'w') as f:
-            f.write(report)
+        """)
         
         print("✅ Report saved as 'analysis_report.txt'")
     
@@ -260,10 +392,16 @@ RECOMMENDATIONS:
         print("="*50)
         
         self.basic_stats()
-        self.create_visualizations()
         self.advanced_analysis()
-        self.create_interactive_plots()
-        self.generate_report()
+        
+        # The three output files are independent and mostly spend their time in
+        # PNG encoding, HTML serialization and file writes, so render them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            list(executor.map(lambda step: step(), [
+                self.create_visualizations,
+                self.create_interactive_plots,
+                self.generate_report
+            ]))
         
         print("\n🎉 Analysis Complete!")
         print("Files generated:")